@@ -9,10 +9,26 @@ goal and the paths to achieve it.
 Based on security vulnerability report: llmdoc/agent/security-vulnerability-report.md
 """
 
-from dataclasses import dataclass, field
-from enum import Enum
-from typing import List, Dict, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import astuple, dataclass, field
+from enum import Enum, IntEnum
+from math import inf
+from operator import attrgetter
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, List, Dict, Iterable, Iterator, Mapping, Optional, Set, Tuple
+import functools
 import json
+import sys
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+# Reports are written next to this script (docs/security/) by default
+OUTPUT_DIR = Path(__file__).resolve().parent
 
 
 class NodeType(Enum):
@@ -21,7 +37,13 @@ class NodeType(Enum):
     LEAF = "leaf"
 
 
-class Difficulty(Enum):
+# Module-level aliases: a global load is cheaper than NodeType.<member> lookups
+_OR = NodeType.OR
+_AND = NodeType.AND
+_LEAF = NodeType.LEAF
+
+
+class Difficulty(IntEnum):
     TRIVIAL = 1
     LOW = 2
     MEDIUM = 3
@@ -29,7 +51,7 @@ class Difficulty(Enum):
     EXPERT = 5
 
 
-class Cost(Enum):
+class Cost(IntEnum):
     FREE = 0
     LOW = 1
     MEDIUM = 2
@@ -37,7 +59,7 @@ class Cost(Enum):
     VERY_HIGH = 4
 
 
-class DetectionRisk(Enum):
+class DetectionRisk(IntEnum):
     NONE = 0
     LOW = 1
     MEDIUM = 2
@@ -45,7 +67,20 @@ class DetectionRisk(Enum):
     CERTAIN = 4
 
 
-@dataclass
+# Member -> name tables; a dict load is cheaper than the Enum ``.name`` descriptor
+_DIFFICULTY_NAMES: Dict[Difficulty, str] = {m: m.name for m in Difficulty}
+_COST_NAMES: Dict[Cost, str] = {m: m.name for m in Cost}
+_DETECTION_NAMES: Dict[DetectionRisk, str] = {m: m.name for m in DetectionRisk}
+
+# Scoring metric -> C-level getter for the leaf's rating (IntEnum, so already an int)
+_METRIC_VALUES = {
+    "difficulty": attrgetter("attributes.difficulty"),
+    "cost": attrgetter("attributes.cost"),
+    "detection": attrgetter("attributes.detection_risk"),
+}
+
+
+@dataclass(frozen=True, slots=True)
 class AttackAttributes:
     difficulty: Difficulty = Difficulty.MEDIUM
     cost: Cost = Cost.MEDIUM
@@ -55,7 +90,20 @@ class AttackAttributes:
     requires_physical: bool = False
 
 
-@dataclass
+# Flyweight pool: every node with the same attribute values shares one instance
+_ATTRIBUTES_POOL: Dict[Tuple, AttackAttributes] = {}
+
+
+def _pool_key(attributes: AttackAttributes) -> Tuple:
+    """Pool key that only matches identical values.
+
+    Plain equality would merge 3 with 3.0, 0 with False and -0.0 with 0.0,
+    handing a node another node's value and changing what the report emits.
+    """
+    return tuple((type(value), repr(value)) for value in astuple(attributes))
+
+
+@dataclass(slots=True)
 class AttackNode:
     id: str
     name: str
@@ -64,14 +112,66 @@ class AttackNode:
     attributes: AttackAttributes = field(default_factory=AttackAttributes)
     children: List['AttackNode'] = field(default_factory=list)
     mitigations: List[str] = field(default_factory=list)
-    cve_refs: List[str] = field(default_factory=list)
-    file_refs: List[str] = field(default_factory=list)
+    cve_refs: Tuple[str, ...] = ()
+    file_refs: Tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        # Share identical attribute sets and reference strings across nodes
+        self.attributes = _ATTRIBUTES_POOL.setdefault(_pool_key(self.attributes), self.attributes)
+        self.mitigations = [sys.intern(m) for m in self.mitigations]
+        self.cve_refs = tuple(sys.intern(r) for r in self.cve_refs)
+        self.file_refs = tuple(sys.intern(r) for r in self.file_refs)
 
     def add_child(self, child: 'AttackNode') -> None:
         self.children.append(child)
 
 
-@dataclass
+def _walk_preorder(root: AttackNode, visit: Callable[[AttackNode, Any], Any]) -> None:
+    """Call ``visit(node, parent_state)`` for every node occurrence in pre-order.
+
+    ``visit`` returns the state handed to the node's children; the root gets
+    ``None``. A subtree shared between parents is walked under each of them,
+    but a node reached again from inside its own subtree raises ``ValueError``.
+    """
+    on_path: Set[int] = set()
+    # (node, parent_state, leaving): the leaving entry pops the node off the path
+    stack: List[Tuple[AttackNode, Any, bool]] = [(root, None, False)]
+    while stack:
+        node, parent_state, leaving = stack.pop()
+        key = id(node)
+        if leaving:
+            on_path.remove(key)
+            continue
+        if key in on_path:
+            raise ValueError(f"Attack tree contains a cycle through node {node.id!r}")
+        on_path.add(key)
+        state = visit(node, parent_state)
+        stack.append((node, None, True))
+        # Reversed so children are popped, and visited, in their original order
+        stack.extend((child, state, False) for child in reversed(node.children))
+
+
+# A selected attack path: the node plus the sub-paths chosen beneath it
+PathSegment = Tuple[AttackNode, Tuple["PathSegment", ...]]
+# Best path segment under a node together with its score for one metric
+PathResult = Tuple[PathSegment, float]
+
+
+@dataclass(frozen=True, slots=True)
+class TraversalResult:
+    """Everything the report needs from one analysis of an attack tree.
+
+    Leaves are listed once per occurrence, so a leaf shared between parents
+    appears once under each of them, as it is scored. ``paths`` is a
+    read-only view, as the result is shared by every caller until
+    ``invalidate()``.
+    """
+    leaves: Tuple[AttackNode, ...]
+    unmitigated: Tuple[AttackNode, ...]
+    paths: Mapping[str, Tuple[AttackNode, ...]]
+
+
+@dataclass(slots=True)
 class AttackTree:
     name: str
     description: str
@@ -79,751 +179,901 @@ class AttackTree:
     version: str = "1.0"
     severity: str = "Medium"
 
+    _analysis_cache: Optional[TraversalResult] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _render_cache: Optional[Tuple[Dict, str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        # Severity labels repeat across trees; keep a single shared string
+        self.severity = sys.intern(self.severity)
+
     def find_easiest_path(self) -> List[AttackNode]:
         """Find the path with lowest difficulty."""
-        return self._find_path(self.root, minimize="difficulty")
+        return list(self.analyze().paths["difficulty"])
 
     def find_cheapest_path(self) -> List[AttackNode]:
         """Find the path with lowest cost."""
-        return self._find_path(self.root, minimize="cost")
+        return list(self.analyze().paths["cost"])
 
     def find_stealthiest_path(self) -> List[AttackNode]:
         """Find the path with lowest detection risk."""
-        return self._find_path(self.root, minimize="detection")
+        return list(self.analyze().paths["detection"])
 
-    def _find_path(
-        self,
-        node: AttackNode,
-        minimize: str
-    ) -> List[AttackNode]:
-        """Recursive path finding."""
-        if node.node_type == NodeType.LEAF:
-            return [node]
-
-        if not node.children:
-            return [node]
-
-        if node.node_type == NodeType.OR:
-            best_path = None
-            best_score = float('inf')
-
-            for child in node.children:
-                child_path = self._find_path(child, minimize)
-                score = self._path_score(child_path, minimize)
-                if score < best_score:
-                    best_score = score
-                    best_path = child_path
-
-            return [node] + (best_path or [])
-        else:  # AND
-            path = [node]
-            for child in node.children:
-                path.extend(self._find_path(child, minimize))
-            return path
-
-    def _path_score(self, path: List[AttackNode], metric: str) -> float:
-        """Calculate score for a path."""
-        if metric == "difficulty":
-            return sum(n.attributes.difficulty.value for n in path if n.node_type == NodeType.LEAF)
-        elif metric == "cost":
-            return sum(n.attributes.cost.value for n in path if n.node_type == NodeType.LEAF)
-        elif metric == "detection":
-            return sum(n.attributes.detection_risk.value for n in path if n.node_type == NodeType.LEAF)
-        return 0
+    def find_all_optimal_paths(self) -> Dict[str, List[AttackNode]]:
+        """Find the best path for every metric from a single traversal."""
+        return {metric: list(path) for metric, path in self.analyze().paths.items()}
 
     def get_all_leaf_attacks(self) -> List[AttackNode]:
         """Get all leaf attack nodes."""
-        leaves = []
-        self._collect_leaves(self.root, leaves)
-        return leaves
-
-    def _collect_leaves(self, node: AttackNode, leaves: List[AttackNode]) -> None:
-        if node.node_type == NodeType.LEAF:
-            leaves.append(node)
-        for child in node.children:
-            self._collect_leaves(child, leaves)
+        return list(self.analyze().leaves)
 
     def get_unmitigated_attacks(self) -> List[AttackNode]:
         """Find attacks without mitigations."""
-        return [n for n in self.get_all_leaf_attacks() if not n.mitigations]
+        return list(self.analyze().unmitigated)
+
+    def analyze(self) -> TraversalResult:
+        """Collect leaves, unmitigated leaves and best paths.
+
+        The result is cached on the tree until ``invalidate()`` is called.
+        """
+        if self._analysis_cache is None:
+            leaves = tuple(self._collect_leaves(self.root))
+            results = self._find_paths(self.root)
+            self._analysis_cache = TraversalResult(
+                leaves=leaves,
+                unmitigated=tuple(n for n in leaves if not n.mitigations),
+                paths=MappingProxyType({
+                    metric: tuple(self._flatten_path(segment))
+                    for metric, (segment, _) in zip(_METRIC_VALUES, results)
+                }),
+            )
+        return self._analysis_cache
+
+    def invalidate(self) -> None:
+        """Drop cached traversal results after the tree has been mutated."""
+        self._analysis_cache = None
+        self._render_cache = None
+
+    @staticmethod
+    def _collect_leaves(root: AttackNode) -> List[AttackNode]:
+        """Return every leaf occurrence in depth-first order."""
+        leaves: List[AttackNode] = []
+
+        def visit(node: AttackNode, _: Any) -> None:
+            if node.node_type is _LEAF:
+                leaves.append(node)
+
+        _walk_preorder(root, visit)
+        return leaves
+
+    def _find_paths(self, root: AttackNode) -> Tuple[PathResult, ...]:
+        """Path finding for all metrics at once, as an iterative post-order walk.
+
+        Returns one ``(segment, score)`` pair per metric, in ``_METRIC_VALUES``
+        order. Paths are nested ``(node, child_segments)`` tuples that share
+        memoized sub-paths; ``_flatten_path`` materializes the list once.
+        Raises ``ValueError`` if a node is reachable from its own children.
+        """
+        memo: Dict[int, Tuple[PathResult, ...]] = {}
+        # Inner nodes whose children are still being scored; meeting one again is a cycle
+        on_path: Set[int] = set()
+        # (node, children_done): a node is combined once its children are in memo
+        stack: List[Tuple[AttackNode, bool]] = [(root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            key = id(node)
+            if key in memo:
+                continue
+
+            if node.node_type is _LEAF:
+                # Only leaves carry a score; inner nodes sum or pick among children
+                segment = (node, ())
+                memo[key] = tuple((segment, value_of(node)) for value_of in _METRIC_VALUES.values())
+            elif not node.children:
+                memo[key] = (((node, ()), 0),) * len(_METRIC_VALUES)
+            elif not children_done:
+                if key in on_path:
+                    raise ValueError(f"Attack tree contains a cycle through node {node.id!r}")
+                on_path.add(key)
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node.children))
+            else:
+                on_path.remove(key)
+                memo[key] = self._combine(node, [memo[id(c)] for c in node.children])
+
+        return memo[id(root)]
+
+    @staticmethod
+    def _combine(
+        node: AttackNode,
+        child_results: List[Tuple[PathResult, ...]]
+    ) -> Tuple[PathResult, ...]:
+        """Merge per-metric child results: OR keeps the minimum, AND sums."""
+        if node.node_type is _OR:
+            best: List[Tuple[Optional[PathSegment], float]] = [
+                (None, inf)
+            ] * len(_METRIC_VALUES)
+
+            for results in child_results:
+                for i, (child_path, score) in enumerate(results):
+                    if score < best[i][1]:
+                        best[i] = (child_path, score)
+
+            return tuple(
+                ((node, (path,) if path else ()), score) for path, score in best
+            )
+
+        # AND
+        segments: List[List[PathSegment]] = [[] for _ in _METRIC_VALUES]
+        totals = [0] * len(_METRIC_VALUES)
+        for results in child_results:
+            for i, (child_path, score) in enumerate(results):
+                segments[i].append(child_path)
+                totals[i] += score
+        return tuple(
+            ((node, tuple(segs)), total) for segs, total in zip(segments, totals)
+        )
+
+    @staticmethod
+    def _flatten_path(segment: PathSegment) -> List[AttackNode]:
+        """Expand a nested path segment into a flat, pre-ordered node list."""
+        path = []
+        stack = [segment]
+        while stack:
+            node, children = stack.pop()
+            path.append(node)
+            stack.extend(reversed(children))
+        return path
 
     def to_dict(self) -> Dict:
         """Convert to dictionary for serialization."""
+        return self._tree_dict(self._node_to_dict(self.root))
+
+    @property
+    def as_dict(self) -> Dict:
+        """Cached serializable dict; treat as read-only (see ``render``)."""
+        return self.render()[0]
+
+    def render(self) -> Tuple[Dict, str]:
+        """Build the serializable dict and the Mermaid diagram in one walk.
+
+        The result is cached on the tree until ``invalidate()`` is called, so
+        callers must not mutate the returned dict. Use ``to_dict()`` for a
+        fresh copy.
+        """
+        if self._render_cache is not None:
+            return self._render_cache
+
+        roots: List[Dict] = []
+
+        def add_entry(node: AttackNode, siblings: Optional[List[Dict]]) -> List[Dict]:
+            entry = self._node_entry(node)
+            (roots if siblings is None else siblings).append(entry)
+            return entry["children"]
+
+        # The exporter's walk drives both outputs, so they cannot drift apart
+        diagram = MermaidExporter(self).export(add_entry)
+        self._render_cache = (self._tree_dict(roots[0]), diagram)
+        return self._render_cache
+
+    def _tree_dict(self, root_entry: Dict) -> Dict:
+        """Wrap a converted root node with the tree metadata."""
         return {
             "name": self.name,
             "description": self.description,
             "severity": self.severity,
             "version": self.version,
-            "root": self._node_to_dict(self.root)
+            "root": root_entry
         }
 
     def _node_to_dict(self, node: AttackNode) -> Dict:
-        """Convert node to dictionary."""
+        """Convert node and its subtree to nested dictionaries."""
+        roots: List[Dict] = []
+
+        def add_entry(current: AttackNode, siblings: Optional[List[Dict]]) -> List[Dict]:
+            entry = self._node_entry(current)
+            (roots if siblings is None else siblings).append(entry)
+            return entry["children"]
+
+        _walk_preorder(node, add_entry)
+        return roots[0]
+
+    @staticmethod
+    def _node_entry(node: AttackNode) -> Dict:
+        """Convert a single node to a dictionary with an empty children list."""
         return {
             "id": node.id,
             "name": node.name,
             "description": node.description,
             "type": node.node_type.value,
             "attributes": {
-                "difficulty": node.attributes.difficulty.name,
-                "cost": node.attributes.cost.name,
-                "detection_risk": node.attributes.detection_risk.name,
+                "difficulty": _DIFFICULTY_NAMES[node.attributes.difficulty],
+                "cost": _COST_NAMES[node.attributes.cost],
+                "detection_risk": _DETECTION_NAMES[node.attributes.detection_risk],
                 "time_hours": node.attributes.time_hours,
             },
-            "mitigations": node.mitigations,
-            "file_refs": node.file_refs,
-            "children": [self._node_to_dict(c) for c in node.children]
+            "mitigations": list(node.mitigations),
+            "file_refs": list(node.file_refs),
+            "children": []
         }
 
 
+# Leaf styles are fixed per difficulty; mitigated leaves share one override
+_LEAF_STYLES: Dict[Difficulty, str] = {
+    Difficulty.TRIVIAL: "fill:#ff6b6b,stroke:#c92a2a,stroke-width:3px",
+    Difficulty.LOW: "fill:#ffa06b,stroke:#e67700,stroke-width:2px",
+    Difficulty.MEDIUM: "fill:#ffd93d,stroke:#fab005,stroke-width:2px",
+    Difficulty.HIGH: "fill:#6bcb77,stroke:#2f9e44,stroke-width:2px",
+    Difficulty.EXPERT: "fill:#4d96ff,stroke:#1971c2,stroke-width:2px",
+}
+_MITIGATED_LEAF_STYLE = "fill:#d3f9d8,stroke:#51cf66,stroke-width:3px"
+
+# Legend lines appended to every exported diagram, after a blank separator
+_MERMAID_LEGEND = ("",) + tuple(
+    f"    classDef {difficulty.name.lower()} {style}"
+    for difficulty, style in _LEAF_STYLES.items()
+)
+
+
 class MermaidExporter:
     """Export attack trees to Mermaid diagram format."""
 
+    __slots__ = ("tree", "_node_ids")
+
     def __init__(self, tree: AttackTree):
         self.tree = tree
-        self._lines: List[str] = []
-        self._node_count = 0
-        self._node_ids: Dict[str, str] = {}
-
-    def export(self) -> str:
-        """Export tree to Mermaid flowchart."""
-        self._lines = ["flowchart TD"]
-        self._export_node(self.tree.root, None)
-        self._add_legend()
-        return "\n".join(self._lines)
-
-    def _export_node(self, node: AttackNode, parent_id: Optional[str]) -> str:
-        """Recursively export nodes."""
-        if node.id in self._node_ids:
-            node_id = self._node_ids[node.id]
+        self._node_ids: Dict[int, str] = {}
+
+    def export(self, on_node: Optional[Callable[[AttackNode, Any], Any]] = None) -> str:
+        """Export tree to Mermaid flowchart.
+
+        If given, ``on_node(node, parent_state)`` is called for every node in
+        the same walk. Its return value is handed to the node's children as
+        their ``parent_state``; the root receives ``None``.
+        """
+        lines = ["flowchart TD"]
+        self._export_tree(self.tree.root, lines, on_node)
+        lines.extend(_MERMAID_LEGEND)
+        return "\n".join(lines)
+
+    def _export_tree(
+        self,
+        root: AttackNode,
+        lines: List[str],
+        on_node: Optional[Callable[[AttackNode, Any], Any]] = None
+    ) -> None:
+        """Export nodes in pre-order; raises ``ValueError`` on a cycle."""
+        append = lines.append
+
+        # Threads (Mermaid id, on_node state) from each parent to its children
+        def visit(node: AttackNode, parent: Optional[Tuple[str, Any]]) -> Tuple[str, Any]:
+            parent_id, parent_state = parent if parent is not None else (None, None)
+            node_id = self.emit_node(node, parent_id, append)
+            state = on_node(node, parent_state) if on_node is not None else None
+            return node_id, state
+
+        _walk_preorder(root, visit)
+
+    def emit_node(
+        self,
+        node: AttackNode,
+        parent_id: Optional[str],
+        append: Callable[[str], None]
+    ) -> str:
+        """Emit the lines for a single node and return its Mermaid id."""
+        # Keyed by object identity: a node shared between parents keeps one id
+        node_id = self._node_ids.get(id(node))
+        if node_id is None:
+            node_id = f"N{len(self._node_ids)}"
+            self._node_ids[id(node)] = node_id
+
+        if node.node_type is _LEAF:
+            append(f"    style {node_id} {self._get_leaf_style(node)}")
+
+        # Built from the current name so a renamed node never shows a stale label
+        label = node.name.replace("'", "#39;")
+        if node.node_type is _OR:
+            append(f"    {node_id}(('{label}'))")
         else:
-            node_id = f"N{self._node_count}"
-            self._node_count += 1
-            self._node_ids[node.id] = node_id
-
-        # Node shape based on type
-        if node.node_type == NodeType.OR:
-            shape = f"{node_id}(('{node.name}')"
-        elif node.node_type == NodeType.AND:
-            shape = f"{node_id}['{node.name}']"
-        else:  # LEAF
-            style = self._get_leaf_style(node)
-            shape = f"{node_id}['{node.name}']"
-            self._lines.append(f"    style {node_id} {style}")
-
-        self._lines.append(f"    {shape}")
+            append(f"    {node_id}['{label}']")
 
         if parent_id:
-            connector = "-->" if node.node_type != NodeType.AND else "==>"
-            self._lines.append(f"    {parent_id} {connector} {node_id}")
-
-        for child in node.children:
-            self._export_node(child, node_id)
+            connector = "-->" if node.node_type is not _AND else "==>"
+            append(f"    {parent_id} {connector} {node_id}")
 
         return node_id
 
     def _get_leaf_style(self, node: AttackNode) -> str:
         """Get style based on attack attributes."""
-        colors = {
-            Difficulty.TRIVIAL: "fill:#ff6b6b,stroke:#c92a2a,stroke-width:3px",
-            Difficulty.LOW: "fill:#ffa06b,stroke:#e67700,stroke-width:2px",
-            Difficulty.MEDIUM: "fill:#ffd93d,stroke:#fab005,stroke-width:2px",
-            Difficulty.HIGH: "fill:#6bcb77,stroke:#2f9e44,stroke-width:2px",
-            Difficulty.EXPERT: "fill:#4d96ff,stroke:#1971c2,stroke-width:2px",
-        }
-        color = colors.get(node.attributes.difficulty, "fill:#gray")
-        has_mitigation = "stroke:#51cf66,stroke-width:3px" if node.mitigations else ""
-        return color if not has_mitigation else f"fill:#d3f9d8,{has_mitigation}"
-
-    def _add_legend(self):
-        """Add legend to diagram."""
-        self._lines.append("\n    classDef trivial fill:#ff6b6b,stroke:#c92a2a,stroke-width:3px")
-        self._lines.append("    classDef low fill:#ffa06b,stroke:#e67700,stroke-width:2px")
-        self._lines.append("    classDef medium fill:#ffd93d,stroke:#fab005,stroke-width:2px")
-        self._lines.append("    classDef high fill:#6bcb77,stroke:#2f9e44,stroke-width:2px")
-        self._lines.append("    classDef expert fill:#4d96ff,stroke:#1971c2,stroke-width:2px")
-
+        if node.mitigations:
+            return _MITIGATED_LEAF_STYLE
+        return _LEAF_STYLES[node.attributes.difficulty]
+
+
+def _materialize(spec: Dict) -> AttackTree:
+    """Instantiate an attack tree from its declarative spec."""
+    root_spec = spec["root"]
+    root = _node_from_spec(root_spec)
+    stack = [(root, root_spec)]
+    while stack:
+        node, node_spec = stack.pop()
+        for child_spec in node_spec.get("children", ()):
+            child = _node_from_spec(child_spec)
+            node.add_child(child)
+            stack.append((child, child_spec))
 
-def build_complete_system_compromise_tree() -> AttackTree:
-    """
-    Attack Tree: Complete System Compromise
-    ========================================
-    Attacker gains full control over the application and underlying system.
-    """
-    root = AttackNode(
-        id="G1",
-        name="Complete System Compromise",
-        description="Gain full control over the application and underlying system",
-        node_type=NodeType.OR
-    )
-
-    # Sub-goal: Compromise Frontend
-    compromise_frontend = AttackNode(
-        id="S1",
-        name="Compromise Frontend",
-        description="Execute arbitrary code in the frontend context",
-        node_type=NodeType.OR
+    return AttackTree(
+        name=spec["name"],
+        description=spec["description"],
+        root=root,
+        severity=spec["severity"]
     )
 
-    # Attack 1: XSS via innerHTML
-    xss_attack = AttackNode(
-        id="A1",
-        name="XSS via innerHTML",
-        description="Inject malicious script through map location marker data",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.LOW,
-            cost=Cost.LOW,
-            detection_risk=DetectionRisk.MEDIUM,
-            time_hours=2.0
-        ),
-        mitigations=[
-            "Sanitize HTML input",
-            "Use React JSX instead of innerHTML",
-            "Implement Content Security Policy"
-        ],
-        file_refs=["components/ui/map-location-picker.tsx:172-178"]
-    )
 
-    # Attack 2: Supply Chain Compromise
-    supply_chain = AttackNode(
-        id="A2",
-        name="Supply Chain Compromise",
-        description="Compromise a dependency to run malicious code in frontend",
-        node_type=NodeType.LEAF,
+def _node_from_spec(spec: Dict) -> AttackNode:
+    """Create a single node (without children) from a spec entry."""
+    attrs = spec.get("attributes")
+    return AttackNode(
+        id=spec["id"],
+        name=spec["name"],
+        description=spec["description"],
+        node_type=NodeType[spec["type"]],
         attributes=AttackAttributes(
-            difficulty=Difficulty.HIGH,
-            cost=Cost.HIGH,
-            detection_risk=DetectionRisk.LOW,
-            time_hours=40.0
-        ),
-        mitigations=[
-            "Dependency scanning",
-            "Software Bill of Materials (SBOM)",
-            "Pinned dependencies"
-        ],
-        file_refs=["package.json"]
+            difficulty=Difficulty[attrs["difficulty"]],
+            cost=Cost[attrs["cost"]],
+            detection_risk=DetectionRisk[attrs["detection_risk"]],
+            time_hours=attrs["time_hours"],
+            requires_insider=attrs.get("requires_insider", False),
+            requires_physical=attrs.get("requires_physical", False)
+        ) if attrs else AttackAttributes(),
+        mitigations=list(spec.get("mitigations", ())),
+        cve_refs=tuple(spec.get("cve_refs", ())),
+        file_refs=tuple(spec.get("file_refs", ()))
     )
 
-    compromise_frontend.add_child(xss_attack)
-    compromise_frontend.add_child(supply_chain)
 
-    # Sub-goal: Direct Backend Access
-    backend_access = AttackNode(
-        id="S2",
-        name="Direct Backend Access",
-        description="Invoke Tauri commands without authentication",
-        node_type=NodeType.AND
-    )
-
-    # Step 1: No Authentication Required
-    no_auth = AttackNode(
-        id="A3",
-        name="Exploit No Authentication",
-        description="Tauri commands have no permission checks (all 120+ exposed)",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.TRIVIAL,
-            cost=Cost.FREE,
-            detection_risk=DetectionRisk.NONE,
-            time_hours=0.5
-        ),
-        mitigations=[
-            "Implement authentication/authorization layer",
-            "Add permission checks in Tauri commands",
-            "Role-based access control"
-        ],
-        file_refs=["src-tauri/src/lib.rs:101-244"]
-    )
-
-    # Step 2: Call Sensitive Commands
-    sensitive_commands = AttackNode(
-        id="A4",
-        name="Invoke Sensitive Commands",
-        description="Call file system, process, or system commands",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.TRIVIAL,
-            cost=Cost.FREE,
-            detection_risk=DetectionRisk.LOW,
-            time_hours=1.0
-        ),
-        mitigations=[
-            "Restrict command surface",
-            "Sandboxed command execution",
-            "Command whitelisting"
+# Tree specs are plain data: enum members are referenced by name and nodes
+# without explicit attributes fall back to the AttackAttributes defaults.
+# The build_* functions below are cached and hand out one shared tree each;
+# call invalidate() on a tree after mutating it.
+_COMPLETE_SYSTEM_COMPROMISE_SPEC: Dict = {
+    "name": "Complete System Compromise",
+    "description": "Attack paths for gaining full system control",
+    "severity": "CRITICAL",
+    "root": {
+        "id": "G1",
+        "name": "Complete System Compromise",
+        "description": "Gain full control over the application and underlying system",
+        "type": "OR",
+        "children": [
+            # Sub-goal: Compromise Frontend
+            {
+                "id": "S1",
+                "name": "Compromise Frontend",
+                "description": "Execute arbitrary code in the frontend context",
+                "type": "OR",
+                "children": [
+                    # Attack 1: XSS via innerHTML
+                    {
+                        "id": "A1",
+                        "name": "XSS via innerHTML",
+                        "description": "Inject malicious script through map location marker data",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "LOW",
+                            "cost": "LOW",
+                            "detection_risk": "MEDIUM",
+                            "time_hours": 2.0,
+                        },
+                        "mitigations": [
+                            "Sanitize HTML input",
+                            "Use React JSX instead of innerHTML",
+                            "Implement Content Security Policy",
+                        ],
+                        "file_refs": ["components/ui/map-location-picker.tsx:172-178"],
+                    },
+                    # Attack 2: Supply Chain Compromise
+                    {
+                        "id": "A2",
+                        "name": "Supply Chain Compromise",
+                        "description": "Compromise a dependency to run malicious code in frontend",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "HIGH",
+                            "cost": "HIGH",
+                            "detection_risk": "LOW",
+                            "time_hours": 40.0,
+                        },
+                        "mitigations": [
+                            "Dependency scanning",
+                            "Software Bill of Materials (SBOM)",
+                            "Pinned dependencies",
+                        ],
+                        "file_refs": ["package.json"],
+                    },
+                ],
+            },
+            # Sub-goal: Direct Backend Access
+            {
+                "id": "S2",
+                "name": "Direct Backend Access",
+                "description": "Invoke Tauri commands without authentication",
+                "type": "AND",
+                "children": [
+                    # Step 1: No Authentication Required
+                    {
+                        "id": "A3",
+                        "name": "Exploit No Authentication",
+                        "description": "Tauri commands have no permission checks (all 120+ exposed)",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "TRIVIAL",
+                            "cost": "FREE",
+                            "detection_risk": "NONE",
+                            "time_hours": 0.5,
+                        },
+                        "mitigations": [
+                            "Implement authentication/authorization layer",
+                            "Add permission checks in Tauri commands",
+                            "Role-based access control",
+                        ],
+                        "file_refs": ["src-tauri/src/lib.rs:101-244"],
+                    },
+                    # Step 2: Call Sensitive Commands
+                    {
+                        "id": "A4",
+                        "name": "Invoke Sensitive Commands",
+                        "description": "Call file system, process, or system commands",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "TRIVIAL",
+                            "cost": "FREE",
+                            "detection_risk": "LOW",
+                            "time_hours": 1.0,
+                        },
+                        "mitigations": [
+                            "Restrict command surface",
+                            "Sandboxed command execution",
+                            "Command whitelisting",
+                        ],
+                        "file_refs": ["src-tauri/src/lib.rs"],
+                    },
+                ],
+            },
+            # Sub-goal: Path Traversal
+            {
+                "id": "S3",
+                "name": "Path Traversal Attack",
+                "description": "Access arbitrary files on the system",
+                "type": "OR",
+                "children": [
+                    # Attack 3: Path Traversal via open_path
+                    {
+                        "id": "A5",
+                        "name": "Path Traversal via open_path",
+                        "description": "Pass arbitrary file paths to open_path command",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "TRIVIAL",
+                            "cost": "FREE",
+                            "detection_risk": "LOW",
+                            "time_hours": 1.0,
+                        },
+                        "mitigations": [
+                            "Path validation and sanitization",
+                            "Allowlist of permitted directories",
+                            "Chroot/jail filesystem access",
+                        ],
+                        "file_refs": ["src-tauri/src/app_settings.rs:246-289"],
+                    },
+                    # Attack 4: Path Traversal via import/export
+                    {
+                        "id": "A6",
+                        "name": "Path Traversal via import/export",
+                        "description": "User-controlled paths in import_all_data/export_all_data",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "LOW",
+                            "cost": "FREE",
+                            "detection_risk": "LOW",
+                            "time_hours": 2.0,
+                        },
+                        "mitigations": [
+                            "Validate file paths",
+                            "Restrict to app data directory",
+                            "Use secure file dialogs",
+                        ],
+                        "file_refs": ["src-tauri/src/storage.rs:164-267"],
+                    },
+                ],
+            },
         ],
-        file_refs=["src-tauri/src/lib.rs"]
-    )
-
-    backend_access.add_child(no_auth)
-    backend_access.add_child(sensitive_commands)
-
-    # Sub-goal: Path Traversal
-    path_traversal = AttackNode(
-        id="S3",
-        name="Path Traversal Attack",
-        description="Access arbitrary files on the system",
-        node_type=NodeType.OR
-    )
+    },
+}
 
-    # Attack 3: Path Traversal via open_path
-    path_open = AttackNode(
-        id="A5",
-        name="Path Traversal via open_path",
-        description="Pass arbitrary file paths to open_path command",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.TRIVIAL,
-            cost=Cost.FREE,
-            detection_risk=DetectionRisk.LOW,
-            time_hours=1.0
-        ),
-        mitigations=[
-            "Path validation and sanitization",
-            "Allowlist of permitted directories",
-            "Chroot/jail filesystem access"
-        ],
-        file_refs=["src-tauri/src/app_settings.rs:246-289"]
-    )
 
-    # Attack 4: Path Traversal via import/export
-    path_import = AttackNode(
-        id="A6",
-        name="Path Traversal via import/export",
-        description="User-controlled paths in import_all_data/export_all_data",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.LOW,
-            cost=Cost.FREE,
-            detection_risk=DetectionRisk.LOW,
-            time_hours=2.0
-        ),
-        mitigations=[
-            "Validate file paths",
-            "Restrict to app data directory",
-            "Use secure file dialogs"
+@functools.cache
+def build_complete_system_compromise_tree() -> AttackTree:
+    """
+    Attack Tree: Complete System Compromise
+    ========================================
+    Attacker gains full control over the application and underlying system.
+    """
+    return _materialize(_COMPLETE_SYSTEM_COMPROMISE_SPEC)
+
+
+_DATA_EXFILTRATION_SPEC: Dict = {
+    "name": "Data Exfiltration",
+    "description": "Attack paths for stealing sensitive data",
+    "severity": "CRITICAL",
+    "root": {
+        "id": "G2",
+        "name": "Data Exfiltration",
+        "description": "Steal sensitive user data from the application",
+        "type": "OR",
+        "children": [
+            # Method 1: Read Files Directly
+            {
+                "id": "M1",
+                "name": "Read Files Directly",
+                "description": "Access stored data files through path traversal",
+                "type": "AND",
+                "children": [
+                    {
+                        "id": "A7",
+                        "name": "Find App Data Directory",
+                        "description": "Locate application data storage",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "TRIVIAL",
+                            "cost": "FREE",
+                            "detection_risk": "NONE",
+                            "time_hours": 0.5,
+                        },
+                        "file_refs": ["src-tauri/src/storage.rs"],
+                    },
+                    {
+                        "id": "A8",
+                        "name": "Read JSON Files",
+                        "description": "Read plaintext JSON storage files",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "TRIVIAL",
+                            "cost": "FREE",
+                            "detection_risk": "LOW",
+                            "time_hours": 0.5,
+                        },
+                        "mitigations": [
+                            "Encrypt sensitive data at rest",
+                            "Use system credential storage",
+                            "File permissions",
+                        ],
+                        "file_refs": ["src-tauri/src/storage.rs:83-98"],
+                    },
+                ],
+            },
+            # Method 2: Extract from localStorage
+            {
+                "id": "M2",
+                "name": "Extract from localStorage",
+                "description": "Access browser localStorage with sensitive data",
+                "type": "AND",
+                "children": [
+                    {
+                        "id": "A9",
+                        "name": "Execute XSS or DevTools",
+                        "description": "Gain JavaScript execution context",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "LOW",
+                            "cost": "LOW",
+                            "detection_risk": "MEDIUM",
+                            "time_hours": 2.0,
+                        },
+                        "mitigations": [
+                            "Content Security Policy",
+                            "XSS prevention",
+                            "DevTools protection in production",
+                        ],
+                    },
+                    {
+                        "id": "A10",
+                        "name": "Read localStorage",
+                        "description": "Access unencrypted data in localStorage",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "TRIVIAL",
+                            "cost": "FREE",
+                            "detection_risk": "NONE",
+                            "time_hours": 0.1,
+                        },
+                        "mitigations": [
+                            "Encrypt data before storage",
+                            "Use secure credential manager",
+                            "Minimal data in localStorage",
+                        ],
+                        "file_refs": ["lib/storage/web-storage.ts"],
+                    },
+                ],
+            },
+            # Method 3: SSRF to Internal Services
+            {
+                "id": "M3",
+                "name": "SSRF to Internal Services",
+                "description": "Use application to probe internal network",
+                "type": "AND",
+                "children": [
+                    {
+                        "id": "A11",
+                        "name": "Inject Internal URLs",
+                        "description": "Pass internal URLs to prefetch_url or cache fetch",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "LOW",
+                            "cost": "FREE",
+                            "detection_risk": "MEDIUM",
+                            "time_hours": 2.0,
+                        },
+                        "mitigations": [
+                            "URL whitelist validation",
+                            "Block internal/private IPs",
+                            "Network segmentation",
+                        ],
+                        "file_refs": [
+                            "src-tauri/src/unified_cache.rs:332-366",
+                            "lib/offline/unified-cache.ts:372-425",
+                        ],
+                    },
+                    {
+                        "id": "A12",
+                        "name": "Exfiltrate Responses",
+                        "description": "Capture responses from internal services",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "LOW",
+                            "cost": "FREE",
+                            "detection_risk": "LOW",
+                            "time_hours": 1.0,
+                        },
+                        "mitigations": [
+                            "Response validation",
+                            "Data loss prevention",
+                            "Network monitoring",
+                        ],
+                    },
+                ],
+            },
         ],
-        file_refs=["src-tauri/src/storage.rs:164-267"]
-    )
-
-    path_traversal.add_child(path_open)
-    path_traversal.add_child(path_import)
-
-    root.add_child(compromise_frontend)
-    root.add_child(backend_access)
-    root.add_child(path_traversal)
-
-    return AttackTree(
-        name="Complete System Compromise",
-        description="Attack paths for gaining full system control",
-        root=root,
-        severity="CRITICAL"
-    )
+    },
+}
 
 
+@functools.cache
 def build_data_exfiltration_tree() -> AttackTree:
     """
     Attack Tree: Data Exfiltration
     ===============================
     Attacker steals sensitive user data from the application.
     """
-    root = AttackNode(
-        id="G2",
-        name="Data Exfiltration",
-        description="Steal sensitive user data from the application",
-        node_type=NodeType.OR
-    )
-
-    # Method 1: Read Files Directly
-    read_files = AttackNode(
-        id="M1",
-        name="Read Files Directly",
-        description="Access stored data files through path traversal",
-        node_type=NodeType.AND
-    )
-
-    step1 = AttackNode(
-        id="A7",
-        name="Find App Data Directory",
-        description="Locate application data storage",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.TRIVIAL,
-            cost=Cost.FREE,
-            detection_risk=DetectionRisk.NONE,
-            time_hours=0.5
-        ),
-        file_refs=["src-tauri/src/storage.rs"]
-    )
-
-    step2 = AttackNode(
-        id="A8",
-        name="Read JSON Files",
-        description="Read plaintext JSON storage files",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.TRIVIAL,
-            cost=Cost.FREE,
-            detection_risk=DetectionRisk.LOW,
-            time_hours=0.5
-        ),
-        mitigations=[
-            "Encrypt sensitive data at rest",
-            "Use system credential storage",
-            "File permissions"
-        ],
-        file_refs=["src-tauri/src/storage.rs:83-98"]
-    )
-
-    read_files.add_child(step1)
-    read_files.add_child(step2)
-
-    # Method 2: Extract from localStorage
-    extract_storage = AttackNode(
-        id="M2",
-        name="Extract from localStorage",
-        description="Access browser localStorage with sensitive data",
-        node_type=NodeType.AND
-    )
-
-    step3 = AttackNode(
-        id="A9",
-        name="Execute XSS or DevTools",
-        description="Gain JavaScript execution context",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.LOW,
-            cost=Cost.LOW,
-            detection_risk=DetectionRisk.MEDIUM,
-            time_hours=2.0
-        ),
-        mitigations=[
-            "Content Security Policy",
-            "XSS prevention",
-            "DevTools protection in production"
-        ]
-    )
-
-    step4 = AttackNode(
-        id="A10",
-        name="Read localStorage",
-        description="Access unencrypted data in localStorage",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.TRIVIAL,
-            cost=Cost.FREE,
-            detection_risk=DetectionRisk.NONE,
-            time_hours=0.1
-        ),
-        mitigations=[
-            "Encrypt data before storage",
-            "Use secure credential manager",
-            "Minimal data in localStorage"
-        ],
-        file_refs=["lib/storage/web-storage.ts"]
-    )
-
-    extract_storage.add_child(step3)
-    extract_storage.add_child(step4)
-
-    # Method 3: SSRF to Internal Services
-    ssrf = AttackNode(
-        id="M3",
-        name="SSRF to Internal Services",
-        description="Use application to probe internal network",
-        node_type=NodeType.AND
-    )
-
-    step5 = AttackNode(
-        id="A11",
-        name="Inject Internal URLs",
-        description="Pass internal URLs to prefetch_url or cache fetch",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.LOW,
-            cost=Cost.FREE,
-            detection_risk=DetectionRisk.MEDIUM,
-            time_hours=2.0
-        ),
-        mitigations=[
-            "URL whitelist validation",
-            "Block internal/private IPs",
-            "Network segmentation"
+    return _materialize(_DATA_EXFILTRATION_SPEC)
+
+
+_DENIAL_OF_SERVICE_SPEC: Dict = {
+    "name": "Denial of Service",
+    "description": "Attack paths for making the application unavailable",
+    "severity": "HIGH",
+    "root": {
+        "id": "G3",
+        "name": "Denial of Service",
+        "description": "Make the application unavailable or unresponsive",
+        "type": "OR",
+        "children": [
+            # Method 1: Resource Exhaustion via Large Inputs
+            {
+                "id": "M4",
+                "name": "Resource Exhaustion",
+                "description": "Exhaust memory or disk space with oversized inputs",
+                "type": "OR",
+                "children": [
+                    {
+                        "id": "A13",
+                        "name": "Oversized JSON Deserialization",
+                        "description": "Send massive JSON payload to deserialize",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "TRIVIAL",
+                            "cost": "FREE",
+                            "detection_risk": "HIGH",
+                            "time_hours": 0.5,
+                        },
+                        "mitigations": [
+                            "JSON size limits",
+                            "Streaming parsers",
+                            "Memory quotas",
+                        ],
+                        "file_refs": ["src-tauri/src/storage.rs:92"],
+                    },
+                    {
+                        "id": "A14",
+                        "name": "Cache Flooding",
+                        "description": "Fill disk with unlimited cache entries",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "TRIVIAL",
+                            "cost": "FREE",
+                            "detection_risk": "MEDIUM",
+                            "time_hours": 1.0,
+                        },
+                        "mitigations": [
+                            "Cache size limits",
+                            "LRU eviction",
+                            "Disk space monitoring",
+                        ],
+                        "file_refs": ["src-tauri/src/unified_cache.rs:159-200"],
+                    },
+                    {
+                        "id": "A15",
+                        "name": "Massive CSV Import",
+                        "description": "Import enormous CSV file to exhaust resources",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "TRIVIAL",
+                            "cost": "FREE",
+                            "detection_risk": "MEDIUM",
+                            "time_hours": 1.0,
+                        },
+                        "mitigations": [
+                            "Row count limits",
+                            "Field size limits",
+                            "Streaming CSV parser",
+                        ],
+                        "file_refs": ["src-tauri/src/target_io.rs:175-242"],
+                    },
+                ],
+            },
+            # Method 2: API Abuse (No Rate Limiting)
+            {
+                "id": "M5",
+                "name": "API Abuse",
+                "description": "Flood APIs with requests without rate limiting",
+                "type": "LEAF",
+                "attributes": {
+                    "difficulty": "TRIVIAL",
+                    "cost": "LOW",
+                    "detection_risk": "HIGH",
+                    "time_hours": 0.5,
+                },
+                "mitigations": [
+                    "Rate limiting on all Tauri commands",
+                    "Request throttling",
+                    "Circuit breakers",
+                ],
+                "file_refs": ["src-tauri/src/lib.rs"],
+            },
         ],
-        file_refs=[
-            "src-tauri/src/unified_cache.rs:332-366",
-            "lib/offline/unified-cache.ts:372-425"
-        ]
-    )
-
-    step6 = AttackNode(
-        id="A12",
-        name="Exfiltrate Responses",
-        description="Capture responses from internal services",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.LOW,
-            cost=Cost.FREE,
-            detection_risk=DetectionRisk.LOW,
-            time_hours=1.0
-        ),
-        mitigations=[
-            "Response validation",
-            "Data loss prevention",
-            "Network monitoring"
-        ]
-    )
-
-    ssrf.add_child(step5)
-    ssrf.add_child(step6)
-
-    root.add_child(read_files)
-    root.add_child(extract_storage)
-    root.add_child(ssrf)
-
-    return AttackTree(
-        name="Data Exfiltration",
-        description="Attack paths for stealing sensitive data",
-        root=root,
-        severity="CRITICAL"
-    )
+    },
+}
 
 
+@functools.cache
 def build_denial_of_service_tree() -> AttackTree:
     """
     Attack Tree: Denial of Service
     ===============================
     Attacker makes the application unavailable or unresponsive.
     """
-    root = AttackNode(
-        id="G3",
-        name="Denial of Service",
-        description="Make the application unavailable or unresponsive",
-        node_type=NodeType.OR
-    )
-
-    # Method 1: Resource Exhaustion via Large Inputs
-    resource_exhaustion = AttackNode(
-        id="M4",
-        name="Resource Exhaustion",
-        description="Exhaust memory or disk space with oversized inputs",
-        node_type=NodeType.OR
-    )
-
-    attack1 = AttackNode(
-        id="A13",
-        name="Oversized JSON Deserialization",
-        description="Send massive JSON payload to deserialize",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.TRIVIAL,
-            cost=Cost.FREE,
-            detection_risk=DetectionRisk.HIGH,
-            time_hours=0.5
-        ),
-        mitigations=[
-            "JSON size limits",
-            "Streaming parsers",
-            "Memory quotas"
-        ],
-        file_refs=["src-tauri/src/storage.rs:92"]
-    )
-
-    attack2 = AttackNode(
-        id="A14",
-        name="Cache Flooding",
-        description="Fill disk with unlimited cache entries",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.TRIVIAL,
-            cost=Cost.FREE,
-            detection_risk=DetectionRisk.MEDIUM,
-            time_hours=1.0
-        ),
-        mitigations=[
-            "Cache size limits",
-            "LRU eviction",
-            "Disk space monitoring"
-        ],
-        file_refs=["src-tauri/src/unified_cache.rs:159-200"]
-    )
-
-    attack3 = AttackNode(
-        id="A15",
-        name="Massive CSV Import",
-        description="Import enormous CSV file to exhaust resources",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.TRIVIAL,
-            cost=Cost.FREE,
-            detection_risk=DetectionRisk.MEDIUM,
-            time_hours=1.0
-        ),
-        mitigations=[
-            "Row count limits",
-            "Field size limits",
-            "Streaming CSV parser"
-        ],
-        file_refs=["src-tauri/src/target_io.rs:175-242"]
-    )
-
-    resource_exhaustion.add_child(attack1)
-    resource_exhaustion.add_child(attack2)
-    resource_exhaustion.add_child(attack3)
-
-    # Method 2: API Abuse (No Rate Limiting)
-    api_abuse = AttackNode(
-        id="M5",
-        name="API Abuse",
-        description="Flood APIs with requests without rate limiting",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.TRIVIAL,
-            cost=Cost.LOW,
-            detection_risk=DetectionRisk.HIGH,
-            time_hours=0.5
-        ),
-        mitigations=[
-            "Rate limiting on all Tauri commands",
-            "Request throttling",
-            "Circuit breakers"
+    return _materialize(_DENIAL_OF_SERVICE_SPEC)
+
+
+_INTERNAL_NETWORK_RECON_SPEC: Dict = {
+    "name": "Internal Network Reconnaissance",
+    "description": "Attack paths for scanning internal network via SSRF",
+    "severity": "HIGH",
+    "root": {
+        "id": "G4",
+        "name": "Internal Network Reconnaissance",
+        "description": "Use application to probe internal network and services",
+        "type": "OR",
+        "children": [
+            # Method 1: SSRF via prefetch_url
+            {
+                "id": "M6",
+                "name": "SSRF via URL Injection",
+                "description": "Inject internal URLs into prefetch_url or cache",
+                "type": "AND",
+                "children": [
+                    {
+                        "id": "A16",
+                        "name": "Enumerate Internal IPs",
+                        "description": "Scan internal IP ranges (192.168.x.x, 10.x.x.x)",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "LOW",
+                            "cost": "FREE",
+                            "detection_risk": "MEDIUM",
+                            "time_hours": 4.0,
+                        },
+                        "mitigations": [
+                            "Block private IP ranges",
+                            "URL allowlist only",
+                            "Network egress filtering",
+                        ],
+                        "file_refs": [
+                            "src-tauri/src/unified_cache.rs:332-366",
+                            "lib/offline/unified-cache.ts:372-425",
+                        ],
+                    },
+                    {
+                        "id": "A17",
+                        "name": "Port Scan via URLs",
+                        "description": "Try different ports to find open services",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "LOW",
+                            "cost": "FREE",
+                            "detection_risk": "MEDIUM",
+                            "time_hours": 4.0,
+                        },
+                        "mitigations": [
+                            "Port restrictions",
+                            "Protocol whitelisting (HTTPS only)",
+                            "URL validation",
+                        ],
+                    },
+                    {
+                        "id": "A18",
+                        "name": "Access Cloud Metadata",
+                        "description": "Try cloud metadata endpoints (169.254.169.254)",
+                        "type": "LEAF",
+                        "attributes": {
+                            "difficulty": "LOW",
+                            "cost": "FREE",
+                            "detection_risk": "HIGH",
+                            "time_hours": 1.0,
+                        },
+                        "mitigations": [
+                            "Block link-local addresses",
+                            "Cloud metadata endpoint blocking",
+                            "Network isolation",
+                        ],
+                    },
+                ],
+            },
         ],
-        file_refs=["src-tauri/src/lib.rs"]
-    )
-
-    root.add_child(resource_exhaustion)
-    root.add_child(api_abuse)
-
-    return AttackTree(
-        name="Denial of Service",
-        description="Attack paths for making the application unavailable",
-        root=root,
-        severity="HIGH"
-    )
+    },
+}
 
 
+@functools.cache
 def build_internal_network_recon_tree() -> AttackTree:
     """
     Attack Tree: Internal Network Reconnaissance
     =============================================
     Attacker uses the application to scan and map the internal network.
     """
-    root = AttackNode(
-        id="G4",
-        name="Internal Network Reconnaissance",
-        description="Use application to probe internal network and services",
-        node_type=NodeType.OR
-    )
-
-    # Method 1: SSRF via prefetch_url
-    ssrf_method = AttackNode(
-        id="M6",
-        name="SSRF via URL Injection",
-        description="Inject internal URLs into prefetch_url or cache",
-        node_type=NodeType.AND
-    )
-
-    step1 = AttackNode(
-        id="A16",
-        name="Enumerate Internal IPs",
-        description="Scan internal IP ranges (192.168.x.x, 10.x.x.x)",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.LOW,
-            cost=Cost.FREE,
-            detection_risk=DetectionRisk.MEDIUM,
-            time_hours=4.0
-        ),
-        mitigations=[
-            "Block private IP ranges",
-            "URL allowlist only",
-            "Network egress filtering"
-        ],
-        file_refs=[
-            "src-tauri/src/unified_cache.rs:332-366",
-            "lib/offline/unified-cache.ts:372-425"
-        ]
-    )
+    return _materialize(_INTERNAL_NETWORK_RECON_SPEC)
 
-    step2 = AttackNode(
-        id="A17",
-        name="Port Scan via URLs",
-        description="Try different ports to find open services",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.LOW,
-            cost=Cost.FREE,
-            detection_risk=DetectionRisk.MEDIUM,
-            time_hours=4.0
-        ),
-        mitigations=[
-            "Port restrictions",
-            "Protocol whitelisting (HTTPS only)",
-            "URL validation"
-        ]
-    )
-
-    step3 = AttackNode(
-        id="A18",
-        name="Access Cloud Metadata",
-        description="Try cloud metadata endpoints (169.254.169.254)",
-        node_type=NodeType.LEAF,
-        attributes=AttackAttributes(
-            difficulty=Difficulty.LOW,
-            cost=Cost.FREE,
-            detection_risk=DetectionRisk.HIGH,
-            time_hours=1.0
-        ),
-        mitigations=[
-            "Block link-local addresses",
-            "Cloud metadata endpoint blocking",
-            "Network isolation"
-        ]
-    )
 
-    ssrf_method.add_child(step1)
-    ssrf_method.add_child(step2)
-    ssrf_method.add_child(step3)
-
-    root.add_child(ssrf_method)
-
-    return AttackTree(
-        name="Internal Network Reconnaissance",
-        description="Attack paths for scanning internal network via SSRF",
-        root=root,
-        severity="HIGH"
-    )
-
-
-def generate_all_reports():
-    """Generate all attack tree reports."""
-    trees = [
-        build_complete_system_compromise_tree(),
-        build_data_exfiltration_tree(),
-        build_denial_of_service_tree(),
-        build_internal_network_recon_tree()
-    ]
+def _dump_json(obj: Dict) -> bytes:
+    """Serialize to indented UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    # ensure_ascii=False keeps non-ASCII text raw, as orjson writes it
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
 
-    report = {
-        "title": "Skymap Application Security Attack Trees",
-        "generated": "2025-12-26",
-        "trees": [tree.to_dict() for tree in trees]
-    }
 
-    # Generate JSON report
-    with open("d:/Project/skymap-test/docs/security/attack-trees-report.json", "w") as f:
-        json.dump(report, f, indent=2)
+def _render_tree(tree: AttackTree) -> Tuple[Dict, str]:
+    """Render one tree to its report dict and Markdown diagram section."""
+    tree_dict, diagram = tree.render()
+    section = f"## {tree.name}\n\nSeverity: {tree.severity}\n\n```mermaid\n{diagram}\n```"
+    return tree_dict, section
 
-    # Generate Mermaid diagrams
-    mermaid_diagrams = []
-    for tree in trees:
-        exporter = MermaidExporter(tree)
-        diagram = exporter.export()
-        mermaid_diagrams.append(f"## {tree.name}\n\nSeverity: {tree.severity}\n\n```mermaid\n{diagram}\n```")
 
-    # Generate Markdown report
-    md_report = f"""# Skymap Application Security Attack Trees
+# Markdown report text surrounding the per-tree diagram sections, pre-encoded
+_MD_HEADER = """# Skymap Application Security Attack Trees
 
 **Generated:** 2025-12-26
 **Based on:** Security Vulnerability Report (llmdoc/agent/security-vulnerability-report.md)
@@ -841,7 +1091,9 @@ Attack trees systematically map attacker goals to the paths they can take to ach
 
 ## Attack Scenarios
 
-{chr(10).join(mermaid_diagrams)}
+""".encode("utf-8")
+
+_MD_FOOTER = """
 
 ## Detailed Analysis
 
@@ -1013,17 +1265,62 @@ exploitation" to "secured application."
 - MITRE ATT&CK: https://attack.mitre.org/
 - OWASP Top 10: https://owasp.org/www-project-top-ten/
 - Tauri Security: https://tauri.app/v1/guides/security/
-"""
+""".encode("utf-8")
 
-    with open("d:/Project/skymap-test/docs/security/attack-trees-analysis.md", "w") as f:
-        f.write(md_report)
+
+def _markdown_parts(sections: Iterable[str]) -> Iterator[bytes]:
+    """Yield the Markdown report as encoded parts, diagram sections in between."""
+    yield _MD_HEADER
+    for index, section in enumerate(sections):
+        if index:
+            yield b"\n"
+        yield section.encode("utf-8")
+    yield _MD_FOOTER
+
+
+def generate_all_reports(output_dir: Path = OUTPUT_DIR):
+    """Generate all attack tree reports into ``output_dir``."""
+    trees = [
+        build_complete_system_compromise_tree(),
+        build_data_exfiltration_tree(),
+        build_denial_of_service_tree(),
+        build_internal_network_recon_tree()
+    ]
+
+    rendered = [_render_tree(tree) for tree in trees]
+
+    report = {
+        "title": "Skymap Application Security Attack Trees",
+        "generated": "2025-12-26",
+        "trees": [tree_dict for tree_dict, _ in rendered]
+    }
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    json_bytes = _dump_json(report)
+
+    # The JSON payload is prebuilt, so its write runs on a worker thread (the
+    # GIL is released during the syscall) while the Markdown report streams
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # Generate JSON report
+        json_write = pool.submit((output_dir / "attack-trees-report.json").write_bytes, json_bytes)
+
+        # Generate Markdown report. Sections are encoded and written one at a time,
+        # so the document is never joined into one string.
+        # Binary mode skips the text codec layer and newline translation.
+        md_path = output_dir / "attack-trees-analysis.md"
+        with md_path.open("wb", buffering=1 << 16) as f:
+            f.writelines(_markdown_parts(section for _, section in rendered))
+
+        json_write.result()
 
     print("✓ Generated attack-trees-report.json")
     print("✓ Generated attack-trees-analysis.md")
     print("\nSummary:")
     print(f"  - {len(trees)} attack scenarios analyzed")
-    print(f"  - {sum(len(t.get_all_leaf_attacks()) for t in trees)} total attack paths identified")
-    print(f"  - {sum(len(t.get_unmitigated_attacks()) for t in trees)} unmitigated attacks found")
+    analyses = [t.analyze() for t in trees]
+    print(f"  - {sum(len(a.leaves) for a in analyses)} total attack paths identified")
+    print(f"  - {sum(len(a.unmitigated) for a in analyses)} unmitigated attacks found")
 
     return trees
 
@@ -1031,20 +1328,20 @@ exploitation" to "secured application."
 if __name__ == "__main__":
     trees = generate_all_reports()
 
-    # Print easiest paths for each tree
-    print("\n" + "="*80)
-    print("EASIEST ATTACK PATHS (By Difficulty)")
-    print("="*80)
+    # Print easiest paths for each tree, batched into a single write
+    out = ["", "=" * 80, "EASIEST ATTACK PATHS (By Difficulty)", "=" * 80]
 
     for tree in trees:
-        print(f"\n{tree.name} ({tree.severity}):")
-        path = tree.find_easiest_path()
-        for node in path:
-            if node.node_type == NodeType.LEAF:
-                print(f"  → {node.name}")
-                print(f"    Difficulty: {node.attributes.difficulty.name}")
-                print(f"    Cost: {node.attributes.cost.name}")
-                print(f"    Detection: {node.attributes.detection_risk.name}")
-                print(f"    Time: {node.attributes.time_hours}h")
+        out.append(f"\n{tree.name} ({tree.severity}):")
+        for node in tree.find_easiest_path():
+            if node.node_type is _LEAF:
+                out.append(f"  → {node.name}")
+                out.append(f"    Difficulty: {_DIFFICULTY_NAMES[node.attributes.difficulty]}")
+                out.append(f"    Cost: {_COST_NAMES[node.attributes.cost]}")
+                out.append(f"    Detection: {_DETECTION_NAMES[node.attributes.detection_risk]}")
+                out.append(f"    Time: {node.attributes.time_hours}h")
                 if node.file_refs:
-                    print(f"    Files: {', '.join(node.file_refs)}")
+                    out.append(f"    Files: {', '.join(node.file_refs)}")
+
+    out.append("")
+    sys.stdout.write("\n".join(out))
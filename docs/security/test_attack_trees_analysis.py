@@ -0,0 +1,289 @@
+"""
+Checks for attack-trees-analysis.py: the cached query API, cycle handling
+and the generated reports.
+
+Run from this directory with ``python -m unittest test_attack_trees_analysis``.
+"""
+
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+import importlib.util
+import io
+import json
+import sys
+import tempfile
+import unittest
+
+_HERE = Path(__file__).resolve().parent
+_MODULE_PATH = _HERE / "attack-trees-analysis.py"
+_COMMITTED_REPORT = _HERE / "attack-trees-report.json"
+_spec = importlib.util.spec_from_file_location("attack_trees_analysis", _MODULE_PATH)
+ata = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = ata
+_spec.loader.exec_module(ata)
+
+_BUILDERS = (
+    ata.build_complete_system_compromise_tree,
+    ata.build_data_exfiltration_tree,
+    ata.build_denial_of_service_tree,
+    ata.build_internal_network_recon_tree,
+)
+
+
+def _leaf(node_id: str, difficulty, **kwargs) -> "ata.AttackNode":
+    return ata.AttackNode(
+        id=node_id,
+        name=node_id,
+        description="",
+        node_type=ata.NodeType.LEAF,
+        attributes=ata.AttackAttributes(difficulty=difficulty),
+        **kwargs
+    )
+
+
+def _small_tree():
+    """OR root over an easy and a hard leaf, plus an AND sharing one leaf twice."""
+    easy = _leaf("easy", ata.Difficulty.LOW)
+    hard = _leaf("hard", ata.Difficulty.HIGH, mitigations=["patch"])
+    shared = _leaf("shared", ata.Difficulty.MEDIUM)
+    both = ata.AttackNode(
+        id="both", name="both", description="",
+        node_type=ata.NodeType.AND, children=[shared, shared]
+    )
+    root = ata.AttackNode(
+        id="root", name="root", description="",
+        node_type=ata.NodeType.OR, children=[easy, hard, both]
+    )
+    return ata.AttackTree(name="t", description="", root=root), easy, hard, shared
+
+
+def _ids(nodes):
+    return [node.id for node in nodes]
+
+
+class CachedQueryTests(unittest.TestCase):
+
+    def test_analyze_is_cached_until_invalidate(self):
+        tree, easy, _, _ = _small_tree()
+        first = tree.analyze()
+        self.assertIs(tree.analyze(), first)
+        self.assertEqual(_ids(tree.find_easiest_path()), ["root", "easy"])
+
+        easy.attributes = ata.AttackAttributes(difficulty=ata.Difficulty.EXPERT)
+        # Still the cached answer until the tree is told it changed
+        self.assertIs(tree.analyze(), first)
+        tree.invalidate()
+        self.assertIsNot(tree.analyze(), first)
+        self.assertEqual(_ids(tree.find_easiest_path()), ["root", "hard"])
+        self.assertEqual(
+            _ids(tree.find_all_optimal_paths()["difficulty"]),
+            _ids(tree.find_easiest_path()),
+        )
+
+    def test_paths_are_read_only(self):
+        tree, _, _, _ = _small_tree()
+        with self.assertRaises(TypeError):
+            tree.analyze().paths["difficulty"] = ()
+
+    def test_leaves_are_listed_per_occurrence(self):
+        tree, easy, _, shared = _small_tree()
+        self.assertEqual(_ids(tree.get_all_leaf_attacks()), ["easy", "hard", "shared", "shared"])
+        self.assertEqual(_ids(tree.get_unmitigated_attacks()), ["easy", "shared", "shared"])
+
+        # Children of a leaf are still collected
+        easy.add_child(_leaf("nested", ata.Difficulty.LOW))
+        easy.mitigations.append("waf")
+        tree.invalidate()
+        self.assertEqual(
+            _ids(tree.get_all_leaf_attacks()), ["easy", "nested", "hard", "shared", "shared"]
+        )
+        self.assertEqual(_ids(tree.get_unmitigated_attacks()), ["nested", "shared", "shared"])
+
+    def test_render_is_cached_until_invalidate(self):
+        tree, easy, _, _ = _small_tree()
+        tree_dict, diagram = tree.render()
+        self.assertIs(tree.as_dict, tree_dict)
+        self.assertEqual(diagram, ata.MermaidExporter(tree).export())
+
+        easy.name = "Easy's way"
+        self.assertIs(tree.render()[0], tree_dict)
+        tree.invalidate()
+        tree_dict, diagram = tree.render()
+        self.assertEqual(tree_dict["root"]["children"][0]["name"], "Easy's way")
+        self.assertIn("['Easy#39;s way']", diagram)
+        self.assertEqual(diagram, ata.MermaidExporter(tree).export())
+        self.assertEqual(tree.as_dict, tree.to_dict())
+
+
+def _cyclic_tree():
+    """Two OR nodes pointing at each other: a -> b -> a."""
+    a = ata.AttackNode(id="a", name="a", description="", node_type=ata.NodeType.OR)
+    b = ata.AttackNode(id="b", name="b", description="", node_type=ata.NodeType.OR)
+    a.add_child(b)
+    b.add_child(a)
+    return ata.AttackTree(name="cyclic", description="", root=a)
+
+
+class DumpJsonTests(unittest.TestCase):
+
+    _PAYLOAD = {"n": "Exploit \u2192 thing", "items": [], "hours": 3.5}
+
+    def test_fallback_keeps_non_ascii_raw(self):
+        with mock.patch.object(ata, "orjson", None):
+            dumped = ata._dump_json(self._PAYLOAD)
+        self.assertIn("Exploit \u2192 thing".encode("utf-8"), dumped)
+        self.assertEqual(json.loads(dumped), self._PAYLOAD)
+
+    @unittest.skipIf(ata.orjson is None, "orjson is not installed")
+    def test_fallback_matches_orjson(self):
+        with mock.patch.object(ata, "orjson", None):
+            fallback = ata._dump_json(self._PAYLOAD)
+        self.assertEqual(fallback, ata._dump_json(self._PAYLOAD))
+
+
+class AttributePoolTests(unittest.TestCase):
+
+    def _attributes(self, **kwargs):
+        node = ata.AttackNode(
+            id="n", name="n", description="", node_type=ata.NodeType.LEAF,
+            attributes=ata.AttackAttributes(**kwargs)
+        )
+        return node.attributes
+
+    def test_identical_attributes_are_shared(self):
+        self.assertIs(self._attributes(time_hours=2.5), self._attributes(time_hours=2.5))
+
+    def test_equal_but_different_values_are_kept(self):
+        for first, second in ((3.0, 3), (0.0, -0.0)):
+            self.assertEqual(repr(self._attributes(time_hours=first).time_hours), repr(first))
+            self.assertEqual(repr(self._attributes(time_hours=second).time_hours), repr(second))
+        self.assertIs(self._attributes(requires_insider=False).requires_insider, False)
+        self.assertEqual(type(self._attributes(requires_insider=0).requires_insider), int)
+
+
+class CycleTests(unittest.TestCase):
+
+    def test_serialization_rejects_cycles(self):
+        tree = _cyclic_tree()
+        with self.assertRaises(ValueError):
+            tree.to_dict()
+        with self.assertRaises(ValueError):
+            tree.render()
+        with self.assertRaises(ValueError):
+            ata.MermaidExporter(tree).export()
+
+    def test_leaf_queries_reject_cycles(self):
+        with self.assertRaises(ValueError):
+            _cyclic_tree().get_all_leaf_attacks()
+
+        # Leaves are walked into as well, so a leaf cycle is caught too
+        leaf = _leaf("loop", ata.Difficulty.LOW)
+        leaf.add_child(leaf)
+        tree = ata.AttackTree(name="leaf loop", description="", root=leaf)
+        with self.assertRaises(ValueError):
+            tree.get_unmitigated_attacks()
+
+    def test_path_search_rejects_cycles(self):
+        tree = _cyclic_tree()
+        with self.assertRaises(ValueError):
+            tree.find_easiest_path()
+        # The memoized path search checks on its own, not only via leaf collection
+        with self.assertRaises(ValueError):
+            tree._find_paths(tree.root)
+
+    def test_shared_nodes_are_not_cycles(self):
+        tree, _, _, _ = _small_tree()
+        children = tree.to_dict()["root"]["children"][2]["children"]
+        self.assertEqual([child["id"] for child in children], ["shared", "shared"])
+        self.assertEqual(tree.render()[1], ata.MermaidExporter(tree).export())
+
+        # An inner node shared by two parents is scored under each of them
+        inner = ata.AttackNode(
+            id="inner", name="inner", description="",
+            node_type=ata.NodeType.OR, children=[_leaf("x", ata.Difficulty.LOW)]
+        )
+        root = ata.AttackNode(
+            id="root", name="root", description="",
+            node_type=ata.NodeType.AND, children=[inner, inner]
+        )
+        dag = ata.AttackTree(name="dag", description="", root=root)
+        self.assertEqual(_ids(dag.find_easiest_path()), ["root", "inner", "x", "inner", "x"])
+        self.assertEqual(_ids(dag.get_all_leaf_attacks()), ["x", "x"])
+
+
+class CachedBuilderTests(unittest.TestCase):
+
+    def setUp(self):
+        for build in _BUILDERS:
+            build.cache_clear()
+
+    tearDown = setUp
+
+    def test_builders_hand_out_one_shared_tree(self):
+        for build in _BUILDERS:
+            self.assertIs(build(), build())
+
+    def test_mutated_builder_tree_requeries_after_invalidate(self):
+        tree = ata.build_complete_system_compromise_tree()
+        before = _ids(tree.get_unmitigated_attacks())
+        target = tree.get_all_leaf_attacks()[0]
+        self.assertNotIn(target.id, before)
+        target.mitigations.clear()
+        target.name = "Renamed attack"
+        tree.invalidate()
+
+        self.assertIn(target.id, _ids(tree.get_unmitigated_attacks()))
+        self.assertIn("Renamed attack", tree.render()[1])
+        self.assertEqual(tree.as_dict, tree.to_dict())
+        self.assertIs(ata.build_complete_system_compromise_tree(), tree)
+
+        # A cleared cache rebuilds the pristine tree from its spec
+        ata.build_complete_system_compromise_tree.cache_clear()
+        fresh = ata.build_complete_system_compromise_tree()
+        self.assertIsNot(fresh, tree)
+        self.assertEqual(_ids(fresh.get_unmitigated_attacks()), before)
+
+    def test_dicts_survive_a_json_round_trip(self):
+        for build in _BUILDERS:
+            tree_dict = build().to_dict()
+            self.assertEqual(json.loads(json.dumps(tree_dict)), tree_dict)
+
+
+class GeneratedReportTests(unittest.TestCase):
+    """The spec-built trees must reproduce the committed report exactly."""
+
+    def setUp(self):
+        for build in _BUILDERS:
+            build.cache_clear()
+
+    tearDown = setUp
+
+    def _generate(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out = Path(tmp_dir)
+            with redirect_stdout(io.StringIO()):
+                ata.generate_all_reports(out)
+            return (
+                (out / "attack-trees-report.json").read_bytes(),
+                (out / "attack-trees-analysis.md").read_text(encoding="utf-8"),
+            )
+
+    def test_json_matches_committed_report(self):
+        report, _ = self._generate()
+        self.assertEqual(report, _COMMITTED_REPORT.read_bytes())
+
+    def test_json_fallback_matches_committed_report(self):
+        with mock.patch.object(ata, "orjson", None):
+            report, _ = self._generate()
+        self.assertEqual(report, _COMMITTED_REPORT.read_bytes())
+
+    def test_markdown_draws_or_nodes_as_circles(self):
+        _, markdown = self._generate()
+        self.assertIn("    N0(('Complete System Compromise'))", markdown)
+        self.assertIn("    N1(('Compromise Frontend'))", markdown)
+        self.assertNotIn("N0('Complete System Compromise')", markdown)
+
+
+if __name__ == "__main__":
+    unittest.main()